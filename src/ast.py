@@ -0,0 +1,68 @@
+# AUTOGENERATED
+from dataclasses import dataclass
+from .tokenizer import Token
+
+class ExprVisitorInterface:
+    def accept_binary_expr(self, expr: 'BinaryExpr'):
+        assert(0)  # must be implemented
+    def accept_grouping_expr(self, expr: 'GroupingExpr'):
+        assert(0)  # must be implemented
+    def accept_literal_expr(self, expr: 'LiteralExpr'):
+        assert(0)  # must be implemented
+    def accept_unary_expr(self, expr: 'UnaryExpr'):
+        assert(0)  # must be implemented
+
+@dataclass
+class Expr:
+    def accept(self, visitor: ExprVisitorInterface):
+        assert(0)  # not implemented for bare Expr
+
+@dataclass
+class BinaryExpr(Expr):
+    left: Expr
+    operator: Token
+    right: Expr
+    def accept(self, visitor: ExprVisitorInterface):
+        return visitor.accept_binary_expr(self)
+
+@dataclass
+class GroupingExpr(Expr):
+    expression: Expr
+    def accept(self, visitor: ExprVisitorInterface):
+        return visitor.accept_grouping_expr(self)
+
+@dataclass
+class LiteralExpr(Expr):
+    value: object
+    def accept(self, visitor: ExprVisitorInterface):
+        return visitor.accept_literal_expr(self)
+
+@dataclass
+class UnaryExpr(Expr):
+    operator: Token
+    right: Expr
+    def accept(self, visitor: ExprVisitorInterface):
+        return visitor.accept_unary_expr(self)
+
+class StmtVisitorInterface:
+    def accept_expression_stmt(self, stmt: 'ExpressionStmt'):
+        assert(0)  # must be implemented
+    def accept_print_stmt(self, stmt: 'PrintStmt'):
+        assert(0)  # must be implemented
+
+@dataclass
+class Stmt:
+    def accept(self, visitor: StmtVisitorInterface):
+        assert(0)  # not implemented for bare Stmt
+
+@dataclass
+class ExpressionStmt(Stmt):
+    expression: Expr
+    def accept(self, visitor: StmtVisitorInterface):
+        return visitor.accept_expression_stmt(self)
+
+@dataclass
+class PrintStmt(Stmt):
+    expression: Expr
+    def accept(self, visitor: StmtVisitorInterface):
+        return visitor.accept_print_stmt(self)
\ No newline at end of file
@@ -0,0 +1,173 @@
+import gc
+from typing import Callable
+from .ast import *
+from .tokenizer import TokenType
+from .evaluate import is_equal, is_truthy
+
+# A compiled expression takes no arguments and returns its value
+CompiledExpr = Callable[[], object]
+# A compiled statement takes no arguments and runs the statement
+CompiledStmt = Callable[[], None]
+
+# Binary operators, resolved once at compile time
+def compile_add(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        left_eval = left()
+        right_eval = right()
+        if (type(left_eval) is float) and (type(right_eval) is float):
+            return left_eval + right_eval
+        elif (type(left_eval) is str) and (type(right_eval) is str):
+            return left_eval + right_eval
+        else:
+            assert(0)
+    return evaluate
+
+def compile_subtract(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        left_eval = left()
+        right_eval = right()
+        assert(type(left_eval) is float)
+        assert(type(right_eval) is float)
+        return left_eval - right_eval
+    return evaluate
+
+def compile_multiply(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        left_eval = left()
+        right_eval = right()
+        assert(type(left_eval) is float)
+        assert(type(right_eval) is float)
+        return left_eval * right_eval
+    return evaluate
+
+def compile_divide(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        left_eval = left()
+        right_eval = right()
+        assert(type(left_eval) is float)
+        assert(type(right_eval) is float)
+        return left_eval / right_eval
+    return evaluate
+
+def compile_greater(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        left_eval = left()
+        right_eval = right()
+        assert(type(left_eval) is float)
+        assert(type(right_eval) is float)
+        return left_eval > right_eval
+    return evaluate
+
+def compile_greater_equal(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        left_eval = left()
+        right_eval = right()
+        assert(type(left_eval) is float)
+        assert(type(right_eval) is float)
+        return left_eval >= right_eval
+    return evaluate
+
+def compile_less(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        left_eval = left()
+        right_eval = right()
+        assert(type(left_eval) is float)
+        assert(type(right_eval) is float)
+        return left_eval < right_eval
+    return evaluate
+
+def compile_less_equal(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        left_eval = left()
+        right_eval = right()
+        assert(type(left_eval) is float)
+        assert(type(right_eval) is float)
+        return left_eval <= right_eval
+    return evaluate
+
+def compile_equal(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    return lambda: is_equal(left(), right())
+
+def compile_not_equal(left: CompiledExpr, right: CompiledExpr) -> CompiledExpr:
+    return lambda: not is_equal(left(), right())
+
+BINARY_COMPILERS = {
+    TokenType.PLUS: compile_add,
+    TokenType.MINUS: compile_subtract,
+    TokenType.STAR: compile_multiply,
+    TokenType.SLASH: compile_divide,
+    TokenType.GREATER: compile_greater,
+    TokenType.GREATER_EQUAL: compile_greater_equal,
+    TokenType.LESS: compile_less,
+    TokenType.LESS_EQUAL: compile_less_equal,
+    TokenType.EQUAL_EQUAL: compile_equal,
+    TokenType.BANG_EQUAL: compile_not_equal,
+}
+
+# Unary operators, resolved once at compile time
+def compile_negate(right: CompiledExpr) -> CompiledExpr:
+    def evaluate():
+        right_eval = right()
+        assert(type(right_eval) is float)
+        return -right_eval
+    return evaluate
+
+def compile_not(right: CompiledExpr) -> CompiledExpr:
+    return lambda: not is_truthy(right())
+
+UNARY_COMPILERS = {
+    TokenType.MINUS: compile_negate,
+    TokenType.BANG: compile_not,
+}
+
+class ClosureCompileVisitor(ExprVisitorInterface, StmtVisitorInterface):
+    # turns every node into a closure over the closures of its children
+    def accept_binary_expr(self, expr: BinaryExpr):
+        return BINARY_COMPILERS[expr.operator.token_type](expr.left.accept(self), expr.right.accept(self))
+
+    def accept_grouping_expr(self, expr: GroupingExpr):
+        # groupings only matter for parsing
+        return expr.expression.accept(self)
+
+    def accept_literal_expr(self, expr: LiteralExpr):
+        value = expr.value
+        return lambda: value
+
+    def accept_unary_expr(self, expr: UnaryExpr):
+        return UNARY_COMPILERS[expr.operator.token_type](expr.right.accept(self))
+
+    def accept_expression_stmt(self, stmt: ExpressionStmt):
+        expression = stmt.expression.accept(self)
+        def execute():
+            expression()
+        return execute
+
+    def accept_print_stmt(self, stmt: PrintStmt):
+        expression = stmt.expression.accept(self)
+        def execute():
+            print(expression())
+        return execute
+
+# singleton object
+CLOSURE_COMPILER = ClosureCompileVisitor()
+
+# singleton helper
+def compile_closures(stmts: list[Stmt]) -> list[CompiledStmt]:
+    # Compiling allocates a few function and cell objects per node, which
+    # otherwise triggers repeated full collections over the whole tree. The
+    # closures only reference their children, so no cycles are missed.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [stmt.accept(CLOSURE_COMPILER) for stmt in stmts]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def run_closures(compiled_stmts: list[CompiledStmt]) -> None:
+    for compiled_stmt in compiled_stmts:
+        compiled_stmt()
+
+# compile and run helper
+def execute_closures(stmts: list[Stmt]) -> None:
+    run_closures(compile_closures(stmts))
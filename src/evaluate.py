@@ -100,3 +100,8 @@ def evaluate_expression(expr: Expr) -> object:
 # singleton helper
 def evaluate_stmt(stmt: Stmt) -> None:
     stmt.accept(STMT_EVAL)
+
+# singleton helper
+def evaluate_stmts(stmts: list[Stmt]) -> None:
+    for stmt in stmts:
+        stmt.accept(STMT_EVAL)
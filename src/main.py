@@ -1,12 +1,38 @@
+import argparse
 from sys import argv, stderr
 from .error import had_error
-from .tokenizer import TokenizerContext, StringTokenizer
+from .tokenizer import TokenizerContext, StringTokenizer, TOKENIZERS, scan_file
 from .parser import parse_token_list
-from .evaluate import evaluate_stmt
+from .evaluate import evaluate_stmts
+from .vm import compile_stmts, run_chunk
+from .closure import compile_closures, run_closures
+from .transpile import compile_python, run_python
+from .program_cache import ProgramCache
 from .ast import Stmt
 from enum import Enum
+from typing import Callable, NamedTuple
 
 tokenizer_context: TokenizerContext = TokenizerContext()
+# tokenizer implementation, see TOKENIZERS
+tokenizer_class = StringTokenizer
+
+class Engine(NamedTuple):
+    # turns parsed statements into a program for run
+    compile: Callable[[list[Stmt]], object]
+    run: Callable[[object], None]
+
+# execution engines by name
+ENGINES = {
+    "tree": Engine(list, evaluate_stmts),
+    "vm": Engine(compile_stmts, run_chunk),
+    "closure": Engine(compile_closures, run_closures),
+    "python": Engine(compile_python, run_python),
+}
+# execution engine, see ENGINES
+engine = ENGINES["tree"]
+
+# compiled programs of previous runs
+program_cache = ProgramCache()
 
 class ParsingResults(Enum):
     ok = 0
@@ -17,7 +43,7 @@ def parse(code, interactive) -> tuple[ParsingResults, list[Stmt]]:
     global tokenizer_context
     saved_tokenizer_context = tokenizer_context.copy()
 
-    tokens = StringTokenizer(tokenizer_context, code)
+    tokens = tokenizer_class(tokenizer_context, code)
     tokens = tokens.scan_loop()
 
     if not interactive:
@@ -26,6 +52,19 @@ def parse(code, interactive) -> tuple[ParsingResults, list[Stmt]]:
         tokenizer_context = saved_tokenizer_context
         return ParsingResults.retry, []
 
+    return parse_tokens(tokens)
+
+def parse_file(file) -> tuple[ParsingResults, list[Stmt]]:
+    # tokens are scanned lazily while parsing, so the context is only final
+    # once parsing is done
+    tokens = scan_file(tokenizer_context, file, tokenizer_class)
+    parse_result, stmts = parse_tokens(tokens)
+    if parse_result == ParsingResults.ok and tokenizer_context.block_comment_nesting:
+        return ParsingResults.retry, []
+
+    return parse_result, stmts
+
+def parse_tokens(tokens) -> tuple[ParsingResults, list[Stmt]]:
     stmts = parse_token_list(tokens)
     if stmts is None:
         print("Failed due to parsing error", file=stderr)
@@ -35,10 +74,20 @@ def parse(code, interactive) -> tuple[ParsingResults, list[Stmt]]:
 
     return ParsingResults.ok, stmts
 
-def execute(parse_result: list[Stmt]):
+def execute(parse_result: list[Stmt], cache_code: str | None = None, cache_lines: int = 0):
+    try:
+        program = engine.compile(parse_result)
+    except:
+        print("Runtime error", file=stderr)
+        return False
+
+    if cache_code is not None:
+        program_cache.put(engine, cache_code, program, cache_lines)
+    return execute_program(program)
+
+def execute_program(program: object):
     try:
-        for stmt in parse_result:
-            evaluate_stmt(stmt)
+        engine.run(program)
     except:
         print("Runtime error", file=stderr)
         return False
@@ -51,8 +100,21 @@ class RunResults(Enum):
     error = 2
 
 def run(code, interactive) -> RunResults:
+    # the same code gives the same program when the tokenizer starts clean
+    starts_clean = tokenizer_context.is_clean()
+    if starts_clean and (cached := program_cache.get(engine, code)) is not None:
+        program, lines = cached
+        tokenizer_context.line += lines
+        return RunResults.ok if execute_program(program) else RunResults.error
+
+    first_line = tokenizer_context.line
     parse_result, parse_stmts = parse(code, interactive)
+    if starts_clean and tokenizer_context.is_clean():
+        return run_parsed(parse_result, parse_stmts, code, tokenizer_context.line - first_line)
+    else:
+        return run_parsed(parse_result, parse_stmts)
 
+def run_parsed(parse_result: ParsingResults, parse_stmts: list[Stmt], cache_code: str | None = None, cache_lines: int = 0) -> RunResults:
     if parse_result == ParsingResults.retry:
         return RunResults.retry
 
@@ -60,13 +122,12 @@ def run(code, interactive) -> RunResults:
         exit(1)
 
     assert(parse_result == ParsingResults.ok)
-    exec_result = execute(parse_stmts)
+    exec_result = execute(parse_stmts, cache_code, cache_lines)
     return RunResults.ok if exec_result else RunResults.error
 
 def run_file(path):
     with open(path, "r") as file:
-        code = file.read()
-    run(code, False)
+        run_parsed(*parse_file(file))
     tokenizer_context.on_eof()
 
 def run_prompt():
@@ -91,11 +152,19 @@ def run_prompt():
             assert(run_result == RunResults.ok)
 
 def main():
-    if len(argv) > 2:
-        print(f"Usage: {argv[0] if len(argv) else 'main.py'} [script]", file=stderr)
-        exit(1)
-    elif len(argv) == 2:
-        run_file(argv[1])
+    global tokenizer_class, engine
+    arg_parser = argparse.ArgumentParser(prog=argv[0] if len(argv) else "main.py")
+    arg_parser.add_argument("script", nargs="?")
+    arg_parser.add_argument("--tokenizer", choices=TOKENIZERS.keys(), default="string",
+                            help="tokenizer implementation (default: string)")
+    arg_parser.add_argument("--engine", choices=ENGINES.keys(), default="tree",
+                            help="execution engine (default: tree)")
+    args = arg_parser.parse_args()
+
+    tokenizer_class = TOKENIZERS[args.tokenizer]
+    engine = ENGINES[args.engine]
+    if args.script is not None:
+        run_file(args.script)
     else:
         run_prompt()
 
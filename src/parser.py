@@ -1,5 +1,6 @@
-from typing import List, Literal
-from .tokenizer import Token, TokenType
+from array import array
+from typing import Iterable, Iterator, List, Literal
+from .tokenizer import BufferToken, Token, TokenBuffer, TokenType
 from .error import error
 from .ast import *
 
@@ -59,6 +60,74 @@ class TokenStream:
             # missing a character
             raise EOFError()
 
+class IteratorTokenStream(TokenStream):
+    # reads tokens lazily from an iterator, holding only the next one
+    _iterator: Iterator[Token]
+    _next_token: Token | None
+
+    def __init__(self, tokens: Iterable[Token]):
+        self._iterator = iter(tokens)
+        self._next_token = next(self._iterator, None)
+        self._pos = 0
+
+    def __repr__(self):
+        return f"IteratorTokenStream(pos={self._pos}, next={repr(self._next_token)})"
+
+    def reached_end(self):
+        return self._next_token is None
+
+    def next(self) -> Token:
+        if self._next_token is None:
+            raise EOFError()
+
+        token = self._next_token
+        self._next_token = next(self._iterator, None)
+        self._pos += 1
+        return token
+
+    def check(self, token_type: TokenType) -> bool:
+        if self._next_token is None:
+            return False
+        else:
+            return self._next_token.token_type == token_type
+
+class BufferTokenStream(TokenStream):
+    # reads a TokenBuffer directly, only creating tokens the parser consumes
+    _buffer: TokenBuffer
+    _types: array
+
+    def __init__(self, buffer: TokenBuffer):
+        self._buffer = buffer
+        self._types = buffer.types
+        self._pos = 0
+
+    def __repr__(self):
+        return f"BufferTokenStream(pos={self._pos}, {repr(self._buffer)})"
+
+    def reached_end(self):
+        return self._pos >= len(self._types)
+
+    def next(self) -> Token:
+        if self.reached_end():
+            raise EOFError()
+
+        self._pos += 1
+        return BufferToken(self._buffer, self._pos - 1)
+
+    def check(self, token_type: TokenType) -> bool:
+        if self._pos >= len(self._types):
+            return False
+        else:
+            return self._types[self._pos] == token_type.value
+
+def make_token_stream(tokens: Iterable[Token]) -> TokenStream:
+    if isinstance(tokens, list):
+        return TokenStream(tokens)
+    elif isinstance(tokens, TokenBuffer):
+        return BufferTokenStream(tokens)
+    else:
+        return IteratorTokenStream(tokens)
+
 
 def left_associative_binary(next_precedence, *token_types: TokenType):
     def generated_function(token_stream: TokenStream) -> Expr:
@@ -142,10 +211,10 @@ def parse_statement(token_stream: TokenStream) -> Stmt:
     else:
         return parse_expression_statement(token_stream)
 
-def parse_token_list(token_list: List[Token]) -> list[Stmt] | EOFError | None:
+def parse_token_list(token_list: Iterable[Token]) -> list[Stmt] | EOFError | None:
     stmts: list[Stmt] = []
     try:
-        stream = TokenStream(token_list)
+        stream = make_token_stream(token_list)
         while not stream.reached_end():
             stmts.append(parse_statement(stream))
 
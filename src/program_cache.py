@@ -0,0 +1,30 @@
+from collections import OrderedDict
+
+class ProgramCache:
+    # Compiled programs by engine and source code, so running the same source
+    # again skips tokenizing, parsing and compiling. Only the most recently
+    # used max_size programs are kept.
+    programs: OrderedDict[tuple[object, str], tuple[object, int]]
+    max_size: int
+
+    def __init__(self, max_size: int = 128):
+        self.programs = OrderedDict()
+        self.max_size = max_size
+
+    def __repr__(self):
+        return f"ProgramCache({len(self.programs)}/{self.max_size} programs)"
+
+    # the program, and the number of lines the tokenizer advanced over it
+    def get(self, engine: object, code: str) -> tuple[object, int] | None:
+        key = (engine, code)
+        if key not in self.programs:
+            return None
+
+        self.programs.move_to_end(key)
+        return self.programs[key]
+
+    def put(self, engine: object, code: str, program: object, lines: int):
+        self.programs[(engine, code)] = (program, lines)
+        self.programs.move_to_end((engine, code))
+        if len(self.programs) > self.max_size:
+            self.programs.popitem(last=False)
@@ -1,4 +1,8 @@
+import re
+from array import array
+from bisect import bisect_left
 from enum import Enum
+from typing import Iterator, TextIO
 from .error import error
 
 TokenType = Enum("TokenType", [
@@ -19,6 +23,7 @@ TokenType = Enum("TokenType", [
 ])
 
 class Token:
+    __slots__ = ("token_type", "lexeme", "literal", "line")
     token_type: TokenType
     lexeme: str
     literal: object
@@ -58,6 +63,10 @@ class TokenizerContext:
         elif self.in_string:
             error("Unterminated string", line=self.line)
 
+    # not inside a block comment or a string
+    def is_clean(self) -> bool:
+        return self.block_comment_nesting == 0 and not self.in_string
+
     def copy(self):
         clone = TokenizerContext()
         clone.line = self.line
@@ -132,8 +141,12 @@ class StringTokenizer:
             return "EOF"
         return self.code[self.position + count]
 
+    # consume the next character if it is the expected one
     def match(self, expected: str) -> bool:
-        return self.peek() == expected
+        if self.peek() != expected:
+            return False
+        self.getc()
+        return True
 
     def add_token(self, token_type: TokenType, literal: object = None):
         text = self.code[self.start: self.position]
@@ -274,8 +287,6 @@ class StringTokenizer:
                 while self.peek() not in ["EOF", "\n"]:
                     self.getc()
             elif self.match("*"):
-                # ignore the *
-                self.getc()
                 # support nesting!
                 self.ctx.block_comment_nesting = 1
                 # block comment is complicated enough for a function
@@ -302,3 +313,383 @@ class StringTokenizer:
         while self.position < len(self.code):
             self.scan_token()
         return self.tokens
+
+
+# one alternative per token family, tried after skipping blanks on the line
+TOKEN_PATTERN = re.compile(r"""
+    [ \t\r]*
+    (?:
+        (?P<newline>\n[ \t\r\n]*)
+      | (?P<line_comment>//[^\n]*)
+      | (?P<block_comment>/\*)
+      | (?P<string>")
+      | (?P<number>[0-9]+(?:\.[0-9]+)?)
+      | (?P<word>[A-Za-z_][A-Za-z_0-9]*)
+      | (?P<operator>[!=<>]=?|[(){},.\-+;*/])
+      | (?P<unexpected>[^ \t\r\n])
+    )
+""", re.VERBOSE)
+
+# block comment delimiters, matched left to right without overlapping
+BLOCK_COMMENT_PATTERN = re.compile(r"/\*|\*/")
+
+OPERATOR_TOKENS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+class RegexTokenizer:
+    # Drop-in replacement for StringTokenizer which matches a whole token per
+    # step using TOKEN_PATTERN, and counts newlines in bulk instead of per char.
+    # Produces the same tokens and leaves the context in the same state.
+
+    # using a context stored across string tokenizers
+    ctx: TokenizerContext
+    # the string being tokenized
+    code: str
+    # start of the current token
+    start: int
+    # position in the code
+    position: int
+    # resulting list of tokens
+    tokens: list[Token]
+
+    def __init__(self, ctx: TokenizerContext, code: str):
+        self.ctx = ctx
+        self.code = code
+        self.start = 0
+        self.position = 0
+        self.tokens = []
+
+    def __repr__(self):
+        return f"RegexTokenizer({repr(self.ctx)}, {self.code}, {self.start}, {self.position})"
+
+    def count_lines(self):
+        # line number counting for everything since the token start
+        self.ctx.line += self.code.count("\n", self.start, self.position)
+
+    def add_token(self, token_type: TokenType, literal: object = None):
+        text = self.code[self.start: self.position]
+        self.tokens.append(Token(token_type, text, literal, self.ctx.line))
+
+    def scan_string(self):
+        # the value starts after the opening quote, or right away if resuming
+        value_start = self.position
+        if not self.ctx.in_string:
+            self.ctx.in_string = True
+            self.ctx.string_context = ""
+
+        end = self.code.find('"', self.position)
+
+        # in case of EOF: keep context
+        if end == -1:
+            self.position = len(self.code)
+            self.count_lines()
+            self.ctx.string_context += self.code[value_start:]
+            return
+
+        # Ignore closing "
+        self.position = end + 1
+        self.count_lines()
+        self.ctx.string_context += self.code[value_start: end]
+
+        self.add_token(TokenType.STRING, self.ctx.string_context)
+        # Reset context
+        self.ctx.in_string = False
+        self.ctx.string_context = ""
+
+    def block_comment(self):
+        # There shouldn't be an EOF before the block quote ends
+        self.position = len(self.code)
+
+        for delimiter in BLOCK_COMMENT_PATTERN.finditer(self.code, self.start):
+            if delimiter.group() == "/*":
+                self.ctx.block_comment_nesting += 1
+            else:
+                self.ctx.block_comment_nesting -= 1
+                if self.ctx.block_comment_nesting == 0:
+                    self.position = delimiter.end()
+                    break
+
+        self.count_lines()
+
+    def scan_loop(self):
+        ctx = self.ctx
+        code = self.code
+        tokens = self.tokens
+
+        # finish a block comment or a string from a previous input
+        if self.position < len(code):
+            self.start = self.position
+            if ctx.block_comment_nesting > 0:
+                self.block_comment()
+            elif ctx.in_string:
+                self.scan_string()
+
+        # the hot loop keeps the line number in a local, and syncs it with
+        # the context around the helpers
+        line = ctx.line
+        position = self.position
+        match = TOKEN_PATTERN.match
+        while position < len(code):
+            m = match(code, position)
+            if m is None:
+                # only blanks left
+                position = len(code)
+                break
+
+            position = m.end()
+            kind = m.lastgroup
+            if kind == "operator":
+                text = m.group(kind)
+                tokens.append(Token(OPERATOR_TOKENS[text], text, None, line))
+            elif kind == "word":
+                text = m.group(kind)
+                tokens.append(Token(KEYWORD_TOKENS.get(text, TokenType.IDENTIFIER), text, None, line))
+            elif kind == "number":
+                text = m.group(kind)
+                tokens.append(Token(TokenType.NUMBER, text, float(text), line))
+            elif kind == "newline":
+                line += m.group(kind).count("\n")
+            elif kind == "line_comment":
+                # comment - no token
+                pass
+            elif kind == "unexpected":
+                error("Unexpected character", line=line)
+            else:
+                ctx.line = line
+                self.start = m.start(kind)
+                self.position = position
+                if kind == "string":
+                    self.scan_string()
+                else:
+                    # skip past the opening /*, and support nesting!
+                    self.start = position
+                    ctx.block_comment_nesting = 1
+                    self.block_comment()
+                position = self.position
+                line = ctx.line
+
+        ctx.line = line
+        self.position = position
+        return tokens
+
+# token types by their value, for reading them back from a TokenBuffer
+TOKEN_TYPES = {token_type.value: token_type for token_type in TokenType}
+
+class TokenBuffer:
+    # Struct-of-arrays storage for the tokens of a single source string.
+    # Lexemes are sliced from the source and line numbers are computed from
+    # a newline index only when they are asked for.
+
+    # the tokenized string
+    source: str
+    # line number at the start of the source
+    first_line: int
+    # TokenType values
+    types: array
+    # token offsets in the source
+    starts: array
+    ends: array
+    # index into literal_values, or -1 without a literal. Number literals
+    # are not stored: they are parsed from their lexeme when asked for.
+    literals: array
+    literal_values: list[object]
+    # newline offsets in the source, built on the first line lookup
+    newlines: array | None
+
+    def __init__(self, source: str, first_line: int = 1):
+        self.source = source
+        self.first_line = first_line
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.literals = array("i")
+        self.literal_values = []
+        self.newlines = None
+
+    def __repr__(self):
+        return f"TokenBuffer({len(self)} tokens, first_line={self.first_line})"
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> 'BufferToken':
+        return BufferToken(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield BufferToken(self, index)
+
+    def append(self, token_type: TokenType, start: int, end: int, literal: object = None):
+        self.types.append(token_type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        if literal is None:
+            self.literals.append(-1)
+        else:
+            self.literals.append(len(self.literal_values))
+            self.literal_values.append(literal)
+
+    def token_type(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.types[index]]
+
+    def lexeme(self, index: int) -> str:
+        return self.source[self.starts[index]: self.ends[index]]
+
+    def literal(self, index: int) -> object:
+        if self.types[index] == TokenType.NUMBER.value:
+            return float(self.lexeme(index))
+
+        literal_index = self.literals[index]
+        return None if literal_index == -1 else self.literal_values[literal_index]
+
+    def line_at(self, position: int) -> int:
+        # line number after everything before position was scanned
+        if self.newlines is None:
+            self.newlines = array("I", (m.start() for m in re.finditer("\n", self.source)))
+        return self.first_line + bisect_left(self.newlines, position)
+
+    def line(self, index: int) -> int:
+        # like StringTokenizer, a token gets the line it ends on
+        return self.line_at(self.ends[index])
+
+class BufferToken(Token):
+    # a token read back from a TokenBuffer, with a lazy lexeme and line
+    __slots__ = ("buffer", "index")
+    buffer: TokenBuffer
+    index: int
+
+    def __init__(self, buffer: TokenBuffer, index: int):
+        self.buffer = buffer
+        self.index = index
+        self.token_type = buffer.token_type(index)
+        self.literal = buffer.literal(index)
+
+    @property
+    def lexeme(self) -> str:
+        return self.buffer.lexeme(self.index)
+
+    @property
+    def line(self) -> int:
+        return self.buffer.line(self.index)
+
+class BufferTokenizer(RegexTokenizer):
+    # RegexTokenizer storing its tokens in a TokenBuffer. No newlines are
+    # counted while scanning: ctx.line is advanced once at the end.
+
+    # resulting tokens
+    buffer: TokenBuffer
+
+    def __init__(self, ctx: TokenizerContext, code: str):
+        super().__init__(ctx, code)
+        self.buffer = TokenBuffer(code, ctx.line)
+
+    def __repr__(self):
+        return f"BufferTokenizer({repr(self.ctx)}, {self.code}, {self.start}, {self.position})"
+
+    def count_lines(self):
+        # lines are counted once in scan_loop
+        pass
+
+    def add_token(self, token_type: TokenType, literal: object = None):
+        self.buffer.append(token_type, self.start, self.position, literal)
+
+    def scan_loop(self):
+        ctx = self.ctx
+        code = self.code
+        append = self.buffer.append
+
+        # finish a block comment or a string from a previous input
+        if self.position < len(code):
+            self.start = self.position
+            if ctx.block_comment_nesting > 0:
+                self.block_comment()
+            elif ctx.in_string:
+                self.scan_string()
+
+        position = self.position
+        match = TOKEN_PATTERN.match
+        while position < len(code):
+            m = match(code, position)
+            if m is None:
+                # only blanks left
+                position = len(code)
+                break
+
+            position = m.end()
+            kind = m.lastgroup
+            if kind == "operator":
+                append(OPERATOR_TOKENS[m.group(kind)], m.start(kind), position)
+            elif kind == "word":
+                append(KEYWORD_TOKENS.get(m.group(kind), TokenType.IDENTIFIER), m.start(kind), position)
+            elif kind == "number":
+                append(TokenType.NUMBER, m.start(kind), position)
+            elif kind == "newline" or kind == "line_comment":
+                # no token
+                pass
+            elif kind == "unexpected":
+                error("Unexpected character", line=self.buffer.line_at(position))
+            else:
+                self.start = m.start(kind)
+                self.position = position
+                if kind == "string":
+                    self.scan_string()
+                else:
+                    # skip past the opening /*, and support nesting!
+                    self.start = position
+                    ctx.block_comment_nesting = 1
+                    self.block_comment()
+                position = self.position
+
+        ctx.line += code.count("\n")
+        self.position = position
+        return self.buffer
+
+# tokenizer implementations by name
+TOKENIZERS = {
+    "string": StringTokenizer,
+    "regex": RegexTokenizer,
+    "buffer": BufferTokenizer,
+}
+
+# default number of characters read at a time by scan_file
+CHUNK_SIZE = 1 << 16
+
+def scan_file(ctx: TokenizerContext, file: TextIO, tokenizer_class=StringTokenizer, chunk_size: int = CHUNK_SIZE) -> Iterator[Token]:
+    # Reads the file in chunks and yields its tokens lazily. Chunks are cut
+    # after their last newline: only strings and block comments can span a
+    # newline, and those are carried to the next chunk by the context just
+    # like between REPL lines. The partial last line is kept for the next
+    # chunk, so memory is bounded by chunk_size plus the longest line.
+    pending: list[str] = []
+    while chunk := file.read(chunk_size):
+        cut = chunk.rfind("\n") + 1
+        if cut == 0:
+            # no complete line yet
+            pending.append(chunk)
+            continue
+
+        pending.append(chunk[:cut])
+        yield from tokenizer_class(ctx, "".join(pending)).scan_loop()
+        pending = [chunk[cut:]]
+
+    if rest := "".join(pending):
+        yield from tokenizer_class(ctx, rest).scan_loop()
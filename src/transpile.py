@@ -0,0 +1,143 @@
+import ast as py_ast
+from types import CodeType, FunctionType
+from .ast import *
+from .tokenizer import TokenType
+from .evaluate import is_truthy
+
+# Lox programs are translated into Python functions, so the temporaries
+# used for type checks are fast locals. CPython compiles very large function
+# bodies slowly, so each function gets a bounded number of statements.
+STMTS_PER_FUNCTION = 64
+
+def lox_add(left_eval: object, right_eval: object) -> object:
+    if (type(left_eval) is float) and (type(right_eval) is float):
+        return left_eval + right_eval
+    elif (type(left_eval) is str) and (type(right_eval) is str):
+        return left_eval + right_eval
+    else:
+        assert(0)
+
+def lox_fail() -> None:
+    assert(0)
+
+# Operators which only work on floats
+FLOAT_BINARY_OPERATORS = {
+    TokenType.MINUS: py_ast.Sub,
+    TokenType.SLASH: py_ast.Div,
+    TokenType.STAR: py_ast.Mult,
+}
+
+FLOAT_COMPARISON_OPERATORS = {
+    TokenType.GREATER: py_ast.Gt,
+    TokenType.GREATER_EQUAL: py_ast.GtE,
+    TokenType.LESS: py_ast.Lt,
+    TokenType.LESS_EQUAL: py_ast.LtE,
+}
+
+def name(identifier: str) -> py_ast.Name:
+    return py_ast.Name(identifier, py_ast.Load())
+
+def call(function: str, *args: py_ast.expr) -> py_ast.Call:
+    return py_ast.Call(name(function), list(args), [])
+
+class TranspileVisitor(ExprVisitorInterface, StmtVisitorInterface):
+    # translates nodes into Python AST nodes
+    temporaries: int
+
+    def __init__(self):
+        self.temporaries = 0
+
+    def temporary(self) -> str:
+        self.temporaries += 1
+        return f"t{self.temporaries}"
+
+    def is_float(self, temporary: str, value: py_ast.expr) -> py_ast.expr:
+        # type(temporary := value) is float
+        assign = py_ast.NamedExpr(py_ast.Name(temporary, py_ast.Store()), value)
+        return py_ast.Compare(call("type", assign), [py_ast.Is()], [name("float")])
+
+    def checked(self, checks: list[py_ast.expr], result: py_ast.expr) -> py_ast.expr:
+        # result if all checks pass, otherwise a runtime error
+        test = checks[0] if len(checks) == 1 else py_ast.BoolOp(py_ast.And(), checks)
+        return py_ast.IfExp(test, result, call("lox_fail"))
+
+    def accept_binary_expr(self, expr: BinaryExpr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        token_type = expr.operator.token_type
+
+        if token_type == TokenType.PLUS:
+            return call("lox_add", left, right)
+        elif token_type == TokenType.EQUAL_EQUAL:
+            return py_ast.Compare(left, [py_ast.Eq()], [right])
+        elif token_type == TokenType.BANG_EQUAL:
+            return py_ast.UnaryOp(py_ast.Not(), py_ast.Compare(left, [py_ast.Eq()], [right]))
+
+        left_name = self.temporary()
+        right_name = self.temporary()
+        checks = [self.is_float(left_name, left), self.is_float(right_name, right)]
+        if token_type in FLOAT_BINARY_OPERATORS:
+            result = py_ast.BinOp(name(left_name), FLOAT_BINARY_OPERATORS[token_type](), name(right_name))
+        else:
+            result = py_ast.Compare(name(left_name), [FLOAT_COMPARISON_OPERATORS[token_type]()], [name(right_name)])
+        return self.checked(checks, result)
+
+    def accept_grouping_expr(self, expr: GroupingExpr):
+        # groupings only matter for parsing
+        return expr.expression.accept(self)
+
+    def accept_literal_expr(self, expr: LiteralExpr):
+        return py_ast.Constant(expr.value)
+
+    def accept_unary_expr(self, expr: UnaryExpr):
+        right = expr.right.accept(self)
+
+        if expr.operator.token_type == TokenType.MINUS:
+            right_name = self.temporary()
+            return self.checked([self.is_float(right_name, right)], py_ast.UnaryOp(py_ast.USub(), name(right_name)))
+        elif expr.operator.token_type == TokenType.BANG:
+            return py_ast.UnaryOp(py_ast.Not(), call("is_truthy", right))
+        else:
+            assert(0)
+
+    # temporaries only live within a statement, so each statement reuses
+    # the same names instead of growing the function's locals
+    def accept_expression_stmt(self, stmt: ExpressionStmt):
+        self.temporaries = 0
+        return py_ast.Expr(stmt.expression.accept(self))
+
+    def accept_print_stmt(self, stmt: PrintStmt):
+        self.temporaries = 0
+        return py_ast.Expr(call("print", stmt.expression.accept(self)))
+
+def transpile(stmts: list[Stmt]) -> py_ast.Module:
+    # a module defining one function per STMTS_PER_FUNCTION statements
+    visitor = TranspileVisitor()
+    functions = []
+    for start in range(0, len(stmts), STMTS_PER_FUNCTION):
+        body = [stmt.accept(visitor) for stmt in stmts[start: start + STMTS_PER_FUNCTION]]
+        functions.append(py_ast.FunctionDef(
+            name=f"lox_program_{len(functions)}",
+            args=py_ast.arguments(posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=body,
+            decorator_list=[],
+        ))
+    return py_ast.fix_missing_locations(py_ast.Module(body=functions, type_ignores=[]))
+
+def compile_python(stmts: list[Stmt]) -> list[CodeType]:
+    # code objects of the program's functions, in order
+    module = compile(transpile(stmts), "<lox>", "exec")
+    return [const for const in module.co_consts if isinstance(const, CodeType)]
+
+def run_python(code: list[CodeType]) -> None:
+    program_globals = {
+        "lox_add": lox_add,
+        "lox_fail": lox_fail,
+        "is_truthy": is_truthy,
+    }
+    for function_code in code:
+        FunctionType(function_code, program_globals)()
+
+# compile and run helper
+def execute_python(stmts: list[Stmt]) -> None:
+    run_python(compile_python(stmts))
@@ -0,0 +1,193 @@
+from enum import IntEnum
+from typing import Callable
+from .ast import *
+from .tokenizer import TokenType
+from .evaluate import is_equal, is_truthy
+
+# run_chunk relies on the arithmetic and comparison opcodes being contiguous
+class OpCode(IntEnum):
+    CONSTANT = 0  # operand: index in the constant pool
+    ADD = 1
+    SUBTRACT = 2
+    MULTIPLY = 3
+    DIVIDE = 4
+    GREATER = 5
+    GREATER_EQUAL = 6
+    LESS = 7
+    LESS_EQUAL = 8
+    EQUAL = 9
+    NOT_EQUAL = 10
+    NEGATE = 11
+    NOT = 12
+    PRINT = 13
+    POP = 14
+
+# opcodes by operator, as plain ints for the compiler
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.ADD.value,
+    TokenType.MINUS: OpCode.SUBTRACT.value,
+    TokenType.STAR: OpCode.MULTIPLY.value,
+    TokenType.SLASH: OpCode.DIVIDE.value,
+    TokenType.GREATER: OpCode.GREATER.value,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL.value,
+    TokenType.LESS: OpCode.LESS.value,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL.value,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL.value,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL.value,
+}
+
+UNARY_OPCODES = {
+    TokenType.MINUS: OpCode.NEGATE.value,
+    TokenType.BANG: OpCode.NOT.value,
+}
+
+class Chunk:
+    # flat bytecode: opcodes, each followed by its operand if it has one
+    code: list[int]
+    # constant pool
+    constants: list[object]
+
+    def __init__(self):
+        self.code = []
+        self.constants = []
+
+    def __repr__(self):
+        return f"Chunk({len(self.code)} bytes, {len(self.constants)} constants)"
+
+    def write(self, *code: int):
+        self.code.extend(map(int, code))
+
+    def add_constant(self, value: object) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def disassemble(self) -> str:
+        lines = []
+        ip = 0
+        while ip < len(self.code):
+            op = OpCode(self.code[ip])
+            if op == OpCode.CONSTANT:
+                lines.append(f"{ip:04} {op.name} {self.code[ip + 1]} ({repr(self.constants[self.code[ip + 1]])})")
+                ip += 2
+            else:
+                lines.append(f"{ip:04} {op.name}")
+                ip += 1
+        return "\n".join(lines)
+
+class CompileVisitor(ExprVisitorInterface, StmtVisitorInterface):
+    # emits the bytecode of the visited nodes into a chunk
+    chunk: Chunk
+    emit: Callable[[int], None]
+
+    def __init__(self, chunk: Chunk):
+        self.chunk = chunk
+        self.emit = chunk.code.append
+
+    def accept_binary_expr(self, expr: BinaryExpr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+        self.emit(BINARY_OPCODES[expr.operator.token_type])
+
+    def accept_grouping_expr(self, expr: GroupingExpr):
+        # groupings only matter for parsing
+        expr.expression.accept(self)
+
+    def accept_literal_expr(self, expr: LiteralExpr):
+        self.emit(OpCode.CONSTANT.value)
+        self.emit(len(self.chunk.constants))
+        self.chunk.constants.append(expr.value)
+
+    def accept_unary_expr(self, expr: UnaryExpr):
+        expr.right.accept(self)
+        self.emit(UNARY_OPCODES[expr.operator.token_type])
+
+    def accept_expression_stmt(self, stmt: ExpressionStmt):
+        stmt.expression.accept(self)
+        self.emit(OpCode.POP.value)
+
+    def accept_print_stmt(self, stmt: PrintStmt):
+        stmt.expression.accept(self)
+        self.emit(OpCode.PRINT.value)
+
+def compile_stmts(stmts: list[Stmt]) -> Chunk:
+    chunk = Chunk()
+    visitor = CompileVisitor(chunk)
+    for stmt in stmts:
+        stmt.accept(visitor)
+    return chunk
+
+def run_chunk(chunk: Chunk) -> None:
+    # opcodes as plain ints in locals
+    CONSTANT, ADD, SUBTRACT, MULTIPLY, DIVIDE = OpCode.CONSTANT.value, OpCode.ADD.value, OpCode.SUBTRACT.value, OpCode.MULTIPLY.value, OpCode.DIVIDE.value
+    GREATER, GREATER_EQUAL, LESS, LESS_EQUAL = OpCode.GREATER.value, OpCode.GREATER_EQUAL.value, OpCode.LESS.value, OpCode.LESS_EQUAL.value
+    EQUAL, NOT_EQUAL, NEGATE, NOT = OpCode.EQUAL.value, OpCode.NOT_EQUAL.value, OpCode.NEGATE.value, OpCode.NOT.value
+    PRINT, POP = OpCode.PRINT.value, OpCode.POP.value
+
+    code = chunk.code
+    constants = chunk.constants
+    stack: list[object] = []
+    push = stack.append
+    pop = stack.pop
+
+    ip = 0
+    end = len(code)
+    while ip < end:
+        op = code[ip]
+        ip += 1
+
+        if op == CONSTANT:
+            push(constants[code[ip]])
+            ip += 1
+        elif op <= DIVIDE:
+            right = pop()
+            left = stack[-1]
+            if op == ADD:
+                if (type(left) is float) and (type(right) is float):
+                    stack[-1] = left + right
+                elif (type(left) is str) and (type(right) is str):
+                    stack[-1] = left + right
+                else:
+                    assert(0)
+            else:
+                assert(type(left) is float)
+                assert(type(right) is float)
+                if op == SUBTRACT:
+                    stack[-1] = left - right
+                elif op == MULTIPLY:
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = left / right
+        elif op <= LESS_EQUAL:
+            right = pop()
+            left = stack[-1]
+            assert(type(left) is float)
+            assert(type(right) is float)
+            if op == GREATER:
+                stack[-1] = left > right
+            elif op == GREATER_EQUAL:
+                stack[-1] = left >= right
+            elif op == LESS:
+                stack[-1] = left < right
+            else:
+                stack[-1] = left <= right
+        elif op == EQUAL:
+            right = pop()
+            stack[-1] = is_equal(stack[-1], right)
+        elif op == NOT_EQUAL:
+            right = pop()
+            stack[-1] = not is_equal(stack[-1], right)
+        elif op == NEGATE:
+            assert(type(stack[-1]) is float)
+            stack[-1] = -stack[-1]
+        elif op == NOT:
+            stack[-1] = not is_truthy(stack[-1])
+        elif op == PRINT:
+            print(pop())
+        elif op == POP:
+            pop()
+        else:
+            assert(0)
+
+# compile and run helper
+def execute_bytecode(stmts: list[Stmt]) -> None:
+    run_chunk(compile_stmts(stmts))